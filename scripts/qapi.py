@@ -1564,6 +1564,8 @@ def c_name(name, protect=True):
 
 eatspace = '\033EATSPACE.'
 pointer_suffix = ' *' + eatspace
+eatspace_re = re.compile(re.escape(eatspace) + ' *')
+indent_re = re.compile("^.", re.MULTILINE)
 
 
 def genindent(count):
@@ -1591,11 +1593,8 @@ def cgen(code, **kwds):
     raw = code % kwds
     if indent_level:
         indent = genindent(indent_level)
-        # re.subn() lacks flags support before Python 2.7, use re.compile()
-        raw = re.subn(re.compile("^.", re.MULTILINE),
-                      indent + r'\g<0>', raw)
-        raw = raw[0]
-    return re.sub(re.escape(eatspace) + ' *', '', raw)
+        raw = indent_re.sub(indent + r'\g<0>', raw)
+    return eatspace_re.sub('', raw)
 
 
 def mcgen(code, **kwds):
@@ -13,6 +13,14 @@ import errno
 import socket
 import sys
 
+# ujson decodes straight into C-backed objects and is several times
+# faster than the stdlib json module on large replies (device, machine
+# or CPU model listings); fall back to json when it isn't installed.
+try:
+    import ujson as _json_decoder
+except ImportError:
+    _json_decoder = json
+
 class QMPError(Exception):
     pass
 
@@ -26,6 +34,11 @@ class QMPTimeoutError(QMPError):
     pass
 
 class QEMUMonitorProtocol:
+
+    #: Default receive buffer size; grown on demand when a message
+    #: doesn't fit.
+    RECV_BUF_SIZE = 65536
+
     def __init__(self, address, server=False, debug=False):
         """
         Create a QEMUMonitorProtocol class.
@@ -41,6 +54,8 @@ class QEMUMonitorProtocol:
         self.__events = []
         self.__address = address
         self._debug = debug
+        self.__buf = bytearray(self.RECV_BUF_SIZE)
+        self.__reset_rxbuf()
         self.__sock = self.__get_sock()
         if server:
             self.__sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -56,7 +71,7 @@ class QEMUMonitorProtocol:
 
     def __negotiate_capabilities(self):
         greeting = self.__json_read()
-        if greeting is None or not greeting.has_key('QMP'):
+        if greeting is None or 'QMP' not in greeting:
             raise QMPConnectError
         # Greeting seems ok, negotiate capabilities
         resp = self.cmd('qmp_capabilities')
@@ -64,15 +79,93 @@ class QEMUMonitorProtocol:
             return greeting
         raise QMPCapabilitiesError
 
+    def __reset_rxbuf(self):
+        # Discard buffered data but keep the buffer itself, so that
+        # repeated commands (or reconnections) reuse one allocation
+        # instead of churning the allocator.
+        self.__buflen = 0
+        self.__scan_pos = 0
+        self.__scan_depth = 0
+        self.__scan_in_string = False
+        self.__scan_escape = False
+
+    def __scan_message(self):
+        """
+        Scan buffered data for the end of a complete JSON message.
+
+        Tracks {}/[] balance, ignoring brackets inside strings, so that
+        json.loads is invoked exactly once per message instead of
+        re-parsing a growing buffer after every recv.  Scanning resumes
+        where the previous call stopped, so each byte is visited once.
+
+        @return the end offset of the first complete message, or -1 if
+                the buffered data is still incomplete
+        """
+        buf = self.__buf
+        pos = self.__scan_pos
+        depth = self.__scan_depth
+        in_string = self.__scan_in_string
+        escape = self.__scan_escape
+        end = -1
+        while pos < self.__buflen:
+            ch = buf[pos]
+            pos += 1
+            if escape:
+                escape = False
+            elif in_string and ch == 0x5c:      # backslash
+                escape = True
+            elif ch == 0x22:                    # double quote
+                in_string = not in_string
+            elif not in_string:
+                if ch == 0x7b or ch == 0x5b:    # '{' or '['
+                    depth += 1
+                elif ch == 0x7d or ch == 0x5d:  # '}' or ']'
+                    depth -= 1
+                    if depth == 0:
+                        end = pos
+                        break
+        self.__scan_pos = pos
+        self.__scan_depth = depth
+        self.__scan_in_string = in_string
+        self.__scan_escape = escape
+        return end
+
+    def __read_message(self):
+        """
+        Read one complete JSON message from the socket.
+
+        @return the decoded message, or None on EOF
+        """
+        while True:
+            end = self.__scan_message()
+            if end >= 0:
+                data = bytes(self.__buf[:end])
+                rest = self.__buflen - end
+                self.__buf[:rest] = self.__buf[end:self.__buflen]
+                self.__buflen = rest
+                self.__scan_pos = 0
+                # Shrink a buffer grown by a one-off oversized reply
+                # back to the default, so it doesn't pin memory for
+                # the life of the monitor.
+                if (len(self.__buf) > self.RECV_BUF_SIZE and
+                        rest <= self.RECV_BUF_SIZE):
+                    del self.__buf[self.RECV_BUF_SIZE:]
+                return _json_decoder.loads(data)
+            if self.__buflen == len(self.__buf):
+                self.__buf.extend(bytearray(len(self.__buf)))
+            n = self.__sock.recv_into(memoryview(self.__buf)[self.__buflen:])
+            if n == 0:
+                return
+            self.__buflen += n
+
     def __json_read(self, only_event=False):
         while True:
-            data = self.__sockfile.readline()
-            if not data:
+            resp = self.__read_message()
+            if resp is None:
                 return
-            resp = json.loads(data)
             if 'event' in resp:
                 if self._debug:
-                    print >>sys.stderr, "QMP:<<< %s" % resp
+                    sys.stderr.write("QMP:<<< %s\n" % resp)
                 self.__events.append(resp)
                 if not only_event:
                     continue
@@ -98,7 +191,7 @@ class QEMUMonitorProtocol:
         try:
             self.__json_read()
         except socket.error as err:
-            if err[0] == errno.EAGAIN:
+            if err.errno == errno.EAGAIN:
                 # No data available
                 pass
         self.__sock.setblocking(1)
@@ -128,7 +221,7 @@ class QEMUMonitorProtocol:
         @raise QMPCapabilitiesError if fails to negotiate capabilities
         """
         self.__sock.connect(self.__address)
-        self.__sockfile = self.__sock.makefile()
+        self.__reset_rxbuf()
         if negotiate:
             return self.__negotiate_capabilities()
 
@@ -143,7 +236,7 @@ class QEMUMonitorProtocol:
         """
         self.__sock.settimeout(15)
         self.__sock, _ = self.__sock.accept()
-        self.__sockfile = self.__sock.makefile()
+        self.__reset_rxbuf()
         return self.__negotiate_capabilities()
 
     def cmd_obj(self, qmp_cmd):
@@ -155,18 +248,44 @@ class QEMUMonitorProtocol:
                 been closed
         """
         if self._debug:
-            print >>sys.stderr, "QMP:>>> %s" % qmp_cmd
+            sys.stderr.write("QMP:>>> %s\n" % qmp_cmd)
         try:
-            self.__sock.sendall(json.dumps(qmp_cmd))
+            self.__sock.sendall(json.dumps(qmp_cmd).encode('utf-8'))
         except socket.error as err:
-            if err[0] == errno.EPIPE:
+            if err.errno == errno.EPIPE:
                 return
             raise socket.error(err)
         resp = self.__json_read()
         if self._debug:
-            print >>sys.stderr, "QMP:<<< %s" % resp
+            sys.stderr.write("QMP:<<< %s\n" % resp)
         return resp
 
+    def cmd_obj_batch(self, qmp_cmds):
+        """
+        Send several QMP commands at once and read all their responses.
+
+        The commands are written back-to-back before any response is
+        read, so the socket round-trip latency is paid once for the
+        whole batch instead of once per command.  QMP executes commands
+        in order and replies in order; events arriving in between are
+        cached as usual.
+
+        @param qmp_cmds: list of QMP commands, each a Python dict
+        @return list of QMP responses, in the same order
+        """
+        if self._debug:
+            for qmp_cmd in qmp_cmds:
+                sys.stderr.write("QMP:>>> %s\n" % qmp_cmd)
+        data = ''.join(json.dumps(qmp_cmd) for qmp_cmd in qmp_cmds)
+        self.__sock.sendall(data.encode('utf-8'))
+        resps = []
+        for qmp_cmd in qmp_cmds:
+            resp = self.__json_read()
+            if self._debug:
+                sys.stderr.write("QMP:<<< %s\n" % resp)
+            resps.append(resp)
+        return resps
+
     def cmd(self, name, args=None, id=None):
         """
         Build a QMP command and send it to the QMP Monitor.
@@ -184,10 +303,36 @@ class QEMUMonitorProtocol:
 
     def command(self, cmd, **kwds):
         ret = self.cmd(cmd, kwds)
-        if ret.has_key('error'):
+        if 'error' in ret:
             raise Exception(ret['error']['desc'])
         return ret['return']
 
+    def command_batch(self, cmds):
+        """
+        Build and pipeline several QMP commands, checking each result.
+
+        @param cmds: list of command names, or (name, arguments) tuples
+        @return list of 'return' values, in the same order
+        """
+        qmp_cmds = []
+        for cmd in cmds:
+            if isinstance(cmd, tuple):
+                name, args = cmd
+            else:
+                name, args = cmd, None
+            qmp_cmd = {'execute': name}
+            if args:
+                qmp_cmd['arguments'] = args
+            qmp_cmds.append(qmp_cmd)
+        rets = []
+        for ret in self.cmd_obj_batch(qmp_cmds):
+            if ret is None:
+                raise QMPConnectError("Error while reading from socket")
+            if 'error' in ret:
+                raise Exception(ret['error']['desc'])
+            rets.append(ret['return'])
+        return rets
+
     def pull_event(self, wait=False):
         """
         Get and delete the first available QMP event.
@@ -233,7 +378,6 @@ class QEMUMonitorProtocol:
 
     def close(self):
         self.__sock.close()
-        self.__sockfile.close()
 
     timeout = socket.timeout
 
@@ -35,58 +35,64 @@ def bump_taint():
         taint = taint + 1
 
 
+# Some fields changed names between qemu versions.  This list
+# is used to whitelist such changes in each section / description.
+changed_names = {
+    'apic': ['timer', 'timer_expiry'],
+    'e1000': ['dev', 'parent_obj'],
+    'ehci': ['dev', 'pcidev'],
+    'I440FX': ['dev', 'parent_obj'],
+    'ich9_ahci': ['card', 'parent_obj'],
+    'ich9-ahci': ['ahci', 'ich9_ahci'],
+    'ioh3420': ['PCIDevice', 'PCIEDevice'],
+    'ioh-3240-express-root-port': ['port.br.dev',
+                                   'parent_obj.parent_obj.parent_obj',
+                                   'port.br.dev.exp.aer_log',
+                            'parent_obj.parent_obj.parent_obj.exp.aer_log'],
+    'cirrus_vga': ['hw_cursor_x', 'vga.hw_cursor_x',
+                   'hw_cursor_y', 'vga.hw_cursor_y'],
+    'lsiscsi': ['dev', 'parent_obj'],
+    'mch': ['d', 'parent_obj'],
+    'pci_bridge': ['bridge.dev', 'parent_obj', 'bridge.dev.shpc', 'shpc'],
+    'pcnet': ['pci_dev', 'parent_obj'],
+    'PIIX3': ['pci_irq_levels', 'pci_irq_levels_vmstate'],
+    'piix4_pm': ['dev', 'parent_obj', 'pci0_status',
+                 'acpi_pci_hotplug.acpi_pcihp_pci_status[0x0]',
+                 'pm1a.sts', 'ar.pm1.evt.sts', 'pm1a.en', 'ar.pm1.evt.en',
+                 'pm1_cnt.cnt', 'ar.pm1.cnt.cnt',
+                 'tmr.timer', 'ar.tmr.timer',
+                 'tmr.overflow_time', 'ar.tmr.overflow_time',
+                 'gpe', 'ar.gpe'],
+    'rtl8139': ['dev', 'parent_obj'],
+    'qxl': ['num_surfaces', 'ssd.num_surfaces'],
+    'usb-ccid': ['abProtocolDataStructure', 'abProtocolDataStructure.data'],
+    'usb-host': ['dev', 'parent_obj'],
+    'usb-mouse': ['usb-ptr-queue', 'HIDPointerEventQueue'],
+    'usb-tablet': ['usb-ptr-queue', 'HIDPointerEventQueue'],
+    'vmware_vga': ['card', 'parent_obj'],
+    'vmware_vga_internal': ['depth', 'new_depth'],
+    'xhci': ['pci_dev', 'parent_obj'],
+    'x3130-upstream': ['PCIDevice', 'PCIEDevice'],
+    'xio3130-express-downstream-port': ['port.br.dev',
+                                        'parent_obj.parent_obj.parent_obj',
+                                        'port.br.dev.exp.aer_log',
+                            'parent_obj.parent_obj.parent_obj.exp.aer_log'],
+    'xio3130-downstream': ['PCIDevice', 'PCIEDevice'],
+    'xio3130-express-upstream-port': ['br.dev', 'parent_obj.parent_obj',
+                                      'br.dev.exp.aer_log',
+                                      'parent_obj.parent_obj.exp.aer_log'],
+}
+
+# Section names can change -- see commit 292b1634 for an example.
+changed_sec_names = {
+    "ICH9 LPC": "ICH9-LPC",
+    "e1000-82540em": "e1000",
+}
+
 def check_fields_match(name, s_field, d_field):
     if s_field == d_field:
         return True
 
-    # Some fields changed names between qemu versions.  This list
-    # is used to whitelist such changes in each section / description.
-    changed_names = {
-        'apic': ['timer', 'timer_expiry'],
-        'e1000': ['dev', 'parent_obj'],
-        'ehci': ['dev', 'pcidev'],
-        'I440FX': ['dev', 'parent_obj'],
-        'ich9_ahci': ['card', 'parent_obj'],
-        'ich9-ahci': ['ahci', 'ich9_ahci'],
-        'ioh3420': ['PCIDevice', 'PCIEDevice'],
-        'ioh-3240-express-root-port': ['port.br.dev',
-                                       'parent_obj.parent_obj.parent_obj',
-                                       'port.br.dev.exp.aer_log',
-                                'parent_obj.parent_obj.parent_obj.exp.aer_log'],
-        'cirrus_vga': ['hw_cursor_x', 'vga.hw_cursor_x',
-                       'hw_cursor_y', 'vga.hw_cursor_y'],
-        'lsiscsi': ['dev', 'parent_obj'],
-        'mch': ['d', 'parent_obj'],
-        'pci_bridge': ['bridge.dev', 'parent_obj', 'bridge.dev.shpc', 'shpc'],
-        'pcnet': ['pci_dev', 'parent_obj'],
-        'PIIX3': ['pci_irq_levels', 'pci_irq_levels_vmstate'],
-        'piix4_pm': ['dev', 'parent_obj', 'pci0_status',
-                     'acpi_pci_hotplug.acpi_pcihp_pci_status[0x0]',
-                     'pm1a.sts', 'ar.pm1.evt.sts', 'pm1a.en', 'ar.pm1.evt.en',
-                     'pm1_cnt.cnt', 'ar.pm1.cnt.cnt',
-                     'tmr.timer', 'ar.tmr.timer',
-                     'tmr.overflow_time', 'ar.tmr.overflow_time',
-                     'gpe', 'ar.gpe'],
-        'rtl8139': ['dev', 'parent_obj'],
-        'qxl': ['num_surfaces', 'ssd.num_surfaces'],
-        'usb-ccid': ['abProtocolDataStructure', 'abProtocolDataStructure.data'],
-        'usb-host': ['dev', 'parent_obj'],
-        'usb-mouse': ['usb-ptr-queue', 'HIDPointerEventQueue'],
-        'usb-tablet': ['usb-ptr-queue', 'HIDPointerEventQueue'],
-        'vmware_vga': ['card', 'parent_obj'],
-        'vmware_vga_internal': ['depth', 'new_depth'],
-        'xhci': ['pci_dev', 'parent_obj'],
-        'x3130-upstream': ['PCIDevice', 'PCIEDevice'],
-        'xio3130-express-downstream-port': ['port.br.dev',
-                                            'parent_obj.parent_obj.parent_obj',
-                                            'port.br.dev.exp.aer_log',
-                                'parent_obj.parent_obj.parent_obj.exp.aer_log'],
-        'xio3130-downstream': ['PCIDevice', 'PCIEDevice'],
-        'xio3130-express-upstream-port': ['br.dev', 'parent_obj.parent_obj',
-                                          'br.dev.exp.aer_log',
-                                          'parent_obj.parent_obj.exp.aer_log'],
-    }
-
     if not name in changed_names:
         return False
 
@@ -96,16 +102,10 @@ def check_fields_match(name, s_field, d_field):
     return False
 
 def get_changed_sec_name(sec):
-    # Section names can change -- see commit 292b1634 for an example.
-    changes = {
-        "ICH9 LPC": "ICH9-LPC",
-        "e1000-82540em": "e1000",
-    }
-
-    for item in changes:
+    for item in changed_sec_names:
         if item == sec:
-            return changes[item]
-        if changes[item] == sec:
+            return changed_sec_names[item]
+        if changed_sec_names[item] == sec:
             return item
     return ""
 
@@ -274,12 +274,14 @@ def check_fields(src_fields, dest_fields, desc, sec):
 
 
 def check_subsections(src_sub, dest_sub, desc, sec):
+    # Index dest subsections by name once instead of rescanning the
+    # whole list for every src subsection.
+    dest_by_name = {d_item["name"]: d_item for d_item in dest_sub}
+
     for s_item in src_sub:
         found = False
-        for d_item in dest_sub:
-            if s_item["name"] != d_item["name"]:
-                continue
-
+        d_item = dest_by_name.get(s_item["name"])
+        if d_item is not None:
             found = True
             check_descriptions(s_item, d_item, sec)
 
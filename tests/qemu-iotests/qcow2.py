@@ -58,8 +58,8 @@ class QcowHeader:
         buf = fd.read(buf_size)
 
         header = struct.unpack(QcowHeader.fmt, buf)
-        self.__dict__ = dict((field[2], header[i])
-            for i, field in enumerate(QcowHeader.fields))
+        self.__dict__ = {field[2]: header[i]
+            for i, field in enumerate(QcowHeader.fields)}
 
         self.set_defaults()
         self.cluster_size = 1 << self.cluster_bits
@@ -35,7 +35,7 @@ def err(msg):
 
 def unpack_header(s):
     fields = struct.unpack(header_fmt, s)
-    return dict((field_names[idx], val) for idx, val in enumerate(fields))
+    return {field_names[idx]: val for idx, val in enumerate(fields)}
 
 def pack_header(header):
     fields = tuple(header[x] for x in field_names)